@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Insurance Dataset - Parallel Bulk Loader
+Streams data/*.csv client-side into Neo4j with batched UNWIND statements
+
+Unlike the LOAD CSV guide, the files do not need to be in Neo4j's import
+directory. Usage:
+
+    python data/bulk_load.py --workers 4 --batch-size 5000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError
+
+from csv_schema import (DATA_DIR, FILES, RELATIONSHIP_FILES, constraint_statements, load_order, read_rows,
+                        reference_lookup)
+
+NEO4J_CONFIG = {
+    "uri": os.getenv("NEO4J_URI", "neo4j://localhost:7687"),
+    "user": os.getenv("NEO4J_USER", "neo4j"),
+    "password": os.getenv("NEO4J_PASSWORD", "password"),
+    "database": os.getenv("NEO4J_DATABASE", "insurance")
+}
+
+# Deadlocks and lock timeouts are retried with jittered exponential backoff, a bounded number of times
+MAX_RETRIES = 8
+RETRY_BACKOFF = (0.05, 2.0)
+
+
+# ==========================================
+# Cypher
+# ==========================================
+
+def node_statement(name: str) -> str:
+    spec = FILES[name]
+    statement = (
+        f"UNWIND $rows AS row "
+        f"MERGE (n:{spec['label']} {{{spec['key']}: row.{spec['key']}}}) "
+        f"SET n += row"
+    )
+    status = spec.get("status_label")
+    if status:
+        statement += (
+            f" FOREACH (_ IN CASE WHEN row.{status['column']} = '{status['value']}' THEN [1] ELSE [] END"
+            f" | SET n:{status['label']})"
+        )
+    return statement + " RETURN count(n) AS created"
+
+
+def relationship_statement(name: str, reference: Dict[str, Any]) -> str:
+    source, target = FILES[name], FILES[reference["target"]]
+    arrow = "(a)-[:{0}]->(b)" if reference["direction"] == "out" else "(a)<-[:{0}]-(b)"
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{source['label']} {{{source['key']}: row.source}}) "
+        f"MATCH (b:{target['label']} {{{target['key']}: row.target}}) "
+        f"MERGE {arrow.format(reference['type'])} "
+        f"RETURN count(*) AS created"
+    )
+
+
+def relationship_file_statement(name: str) -> str:
+    spec = RELATIONSHIP_FILES[name]
+    start, end = FILES[spec["start"]["file"]], FILES[spec["end"]["file"]]
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{start['label']} {{{start['key']}: row.source}}) "
+        f"MATCH (b:{end['label']} {{{end['key']}: row.target}}) "
+        f"MERGE (a)-[r:{spec['type']}]->(b) SET r += row.props "
+        f"RETURN count(*) AS created"
+    )
+
+
+# ==========================================
+# Loader
+# ==========================================
+
+def batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+    """Plain batches with no lane: any worker may run them"""
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield None, batch
+
+
+def partitioned(rows: Iterable[Dict[str, Any]], size: int, lanes: int,
+                hub: str) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Batches that each hold rows of one hub lane, sorted so locks are always taken in the same order
+
+    Every relationship locks both endpoints. Rows are routed to a lane by their
+    hub node, so two batches from different lanes never lock the same hub.
+    Memory is bounded by one open batch per lane.
+    """
+    buffers: Dict[int, List[Dict[str, Any]]] = {}
+
+    def ordered(batch):
+        return sorted(batch, key=lambda row: (str(row["target"]), str(row["source"])))
+
+    for row in rows:
+        lane = zlib.crc32(str(row[hub]).encode()) % lanes
+        buffer = buffers.setdefault(lane, [])
+        buffer.append(row)
+        if len(buffer) >= size:
+            yield lane, ordered(buffers.pop(lane))
+    for lane, buffer in buffers.items():
+        yield lane, ordered(buffer)
+
+
+class BulkLoader:
+    """Loads the CSV files with parallel sessions, nodes first, then relationships"""
+
+    def __init__(self, driver, database: str, data_dir: Path = DATA_DIR,
+                 batch_size: int = 5000, workers: int = 4, max_retries: int = MAX_RETRIES):
+        self.driver = driver
+        self.database = database
+        self.data_dir = Path(data_dir)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        # More lanes than workers, so a few hot hubs rarely share a lane
+        self.lanes = workers * 8
+        self.report = []
+
+    def _write(self, statement: str, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Write one batch, retrying deadlocks and lock timeouts up to max_retries times
+
+        Lock wait is the time spent in attempts that failed on a transient
+        error plus the backoff after them.
+        """
+        retries, lock_wait = 0, 0.0
+        while True:
+            started = time.perf_counter()
+            try:
+                with self.driver.session(database=self.database) as session:
+                    with session.begin_transaction() as tx:
+                        written = tx.run(statement, rows=batch).single()["created"]
+                        tx.commit()
+                return {"written": written, "retries": retries, "lock_wait": lock_wait}
+            except TransientError:
+                lock_wait += time.perf_counter() - started
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                low, high = RETRY_BACKOFF
+                delay = min(low * 2 ** retries, high) * random.uniform(0.5, 1.0)
+                time.sleep(delay)
+                lock_wait += delay
+
+    def _run_parallel(self, statement: str, batches: Iterator[Tuple[Any, List[Dict[str, Any]]]],
+                      executor) -> Dict[str, Any]:
+        """Submit batches with at most 2x workers queued or running, so memory stays flat
+
+        Batches of one lane run one at a time; batches without a lane run anywhere.
+        """
+        stats = {"rows": 0, "written": 0, "retries": 0, "lock_wait": 0.0}
+        pending: Dict[Any, deque] = {}
+        in_flight, busy = {}, set()
+        limit = self.workers * 2
+
+        def collect(done):
+            for future in done:
+                lane, size = in_flight.pop(future)
+                busy.discard(lane)
+                result = future.result()
+                stats["rows"] += size
+                for field in ("written", "retries", "lock_wait"):
+                    stats[field] += result[field]
+
+        def dispatch():
+            for lane in list(pending):
+                if len(in_flight) >= limit:
+                    return
+                if lane is not None and lane in busy:
+                    continue
+                batch = pending[lane].popleft()
+                if not pending[lane]:
+                    del pending[lane]
+                if lane is not None:
+                    busy.add(lane)
+                in_flight[executor.submit(self._write, statement, batch)] = (lane, len(batch))
+
+        def queued():
+            return sum(len(batches) for batches in pending.values())
+
+        for lane, batch in batches:
+            pending.setdefault(lane, deque()).append(batch)
+            dispatch()
+            # A hot lane can only drain one batch at a time: stop reading until it catches up
+            while queued() >= limit:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                dispatch()
+        while pending or in_flight:
+            dispatch()
+            collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+        return stats
+
+    def _timed(self, phase: str, name: str, statement: str, batches: Iterator[Tuple[Any, List[Dict[str, Any]]]],
+               executor):
+        started = time.perf_counter()
+        stats = self._run_parallel(statement, batches, executor)
+        elapsed = time.perf_counter() - started
+        entry = {"phase": phase, "name": name, "seconds": elapsed, **stats}
+        self.report.append(entry)
+        retried = f", {stats['retries']:,} retries, {stats['lock_wait']:.2f}s lock wait" if stats["retries"] else ""
+        print(f"  ✓ {name}: {stats['rows']:,} rows in {elapsed:.2f}s "
+              f"({stats['rows'] / elapsed if elapsed else 0:,.0f} rows/s{retried})")
+        return entry
+
+    def _partitioned(self, rows: Iterable[Dict[str, Any]], hub: str):
+        return partitioned(rows, self.batch_size, self.lanes, hub)
+
+    def create_constraints(self, names: List[str]):
+        with self.driver.session(database=self.database) as session:
+            for statement in constraint_statements(names):
+                session.run(statement).consume()
+        print(f"✓ {len(names)} uniqueness constraints in place")
+
+    def _relationship_rows(self, name: str, reference: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        key = FILES[name]["key"]
+        lookup = reference_lookup(reference, self.data_dir) if "target_column" in reference else None
+        for row in read_rows(name, self.data_dir):
+            value = row[reference["column"]]
+            if value is None:
+                continue
+            yield {"source": row[key], "target": lookup.get(value) if lookup is not None else value}
+
+    def _relationship_file_rows(self, name: str) -> Iterator[Dict[str, Any]]:
+        spec = RELATIONSHIP_FILES[name]
+        endpoints = (spec["start"]["column"], spec["end"]["column"])
+        for row in read_rows(name, self.data_dir):
+            props = {column: value for column, value in row.items() if column not in endpoints}
+            yield {"source": row[endpoints[0]], "target": row[endpoints[1]], "props": props}
+
+    def load(self, names: List[str] = None) -> List[Dict[str, Any]]:
+        order = load_order(names)
+        print(f"Load order: {' → '.join(order)}")
+        self.create_constraints(order)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-load") as executor:
+            print("\nNodes:")
+            for name in order:
+                self._timed("nodes", FILES[name]["label"], node_statement(name),
+                            batched(read_rows(name, self.data_dir), self.batch_size), executor)
+
+            # Every node exists before any relationship is created. Relationship
+            # batches are partitioned on their hub (product, branch, agent...) so
+            # concurrent workers lock disjoint hub nodes instead of deadlocking
+            print("\nRelationships:")
+            for name in order:
+                for reference in FILES[name]["references"]:
+                    if reference["target"] not in order:
+                        continue
+                    entry = self._timed("relationships", reference["type"],
+                                        relationship_statement(name, reference),
+                                        self._partitioned(self._relationship_rows(name, reference), "target"),
+                                        executor)
+                    if entry["written"] < entry["rows"]:
+                        print(f"    ⚠️ {entry['rows'] - entry['written']:,} rows referenced a missing "
+                              f"{FILES[reference['target']]['label']}")
+
+            # Relationship-only files, e.g. the agent books from generate_dataset.py
+            for name, spec in RELATIONSHIP_FILES.items():
+                if not (self.data_dir / spec["file"]).exists():
+                    continue
+                if spec["start"]["file"] not in order or spec["end"]["file"] not in order:
+                    continue
+                hub = "source" if spec.get("hub") == "start" else "target"
+                entry = self._timed("relationships", spec["type"], relationship_file_statement(name),
+                                    self._partitioned(self._relationship_file_rows(name), hub), executor)
+                if entry["written"] < entry["rows"]:
+                    print(f"    ⚠️ {entry['rows'] - entry['written']:,} rows referenced a missing node")
+        return self.report
+
+    def print_report(self):
+        print("\n" + "=" * 80)
+        print(f"{'Phase':<15}{'Name':<16}{'Rows':>10}{'Seconds':>10}{'Rows/s':>10}{'Retries':>9}{'Lock wait':>10}")
+        print("-" * 80)
+        # Lock wait is summed across workers, so it can exceed the phase's wall-clock time
+        for entry in self.report:
+            rate = entry["rows"] / entry["seconds"] if entry["seconds"] else 0
+            print(f"{entry['phase']:<15}{entry['name']:<16}{entry['rows']:>10,}{entry['seconds']:>10.2f}{rate:>10,.0f}"
+                  f"{entry['retries']:>9,}{entry['lock_wait']:>9.2f}s")
+        total_rows = sum(entry["rows"] for entry in self.report)
+        total_seconds = sum(entry["seconds"] for entry in self.report)
+        print("-" * 80)
+        print(f"{'Total':<31}{total_rows:>10,}{total_seconds:>10.2f}"
+              f"{total_rows / total_seconds if total_seconds else 0:>10,.0f}"
+              f"{sum(entry['retries'] for entry in self.report):>9,}"
+              f"{sum(entry['lock_wait'] for entry in self.report):>9.2f}s")
+        print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load the insurance CSV files into Neo4j")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="Directory containing the CSV files")
+    parser.add_argument("--files", nargs="*", choices=list(FILES),
+                        help="Files to load (referenced files are loaded too)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per UNWIND batch")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel sessions")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES,
+                        help="Retries per batch on deadlocks and lock timeouts")
+    parser.add_argument("--database", default=NEO4J_CONFIG["database"])
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(NEO4J_CONFIG["uri"], auth=(NEO4J_CONFIG["user"], NEO4J_CONFIG["password"]))
+    try:
+        driver.verify_connectivity()
+        print(f"✓ Connected to Neo4j at {NEO4J_CONFIG['uri']}")
+        loader = BulkLoader(driver, args.database, args.data_dir, args.batch_size, args.workers, args.max_retries)
+        loader.load(args.files)
+        loader.print_report()
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
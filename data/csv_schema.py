@@ -0,0 +1,223 @@
+"""
+Insurance Dataset - CSV Schema
+Column types, keys and foreign keys for the data/*.csv files
+"""
+
+import csv
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+DATA_DIR = Path(__file__).resolve().parent
+
+# One entry per CSV file. "references" are foreign-key columns, each loaded as
+# a relationship from this file's node to the referenced file's node (or the
+# reverse when direction is "in"); the referenced node is the many-to-one hub
+# that parallel relationship loads partition on. Columns not listed in "types"
+# are strings.
+FILES: Dict[str, Dict[str, Any]] = {
+    "branches": {
+        "file": "branches.csv",
+        "label": "Branch",
+        "key": "branch_id",
+        "types": {"opening_date": "date"},
+        "references": []
+    },
+    "products": {
+        "file": "products.csv",
+        "label": "Product",
+        "key": "product_code",
+        "types": {
+            "base_rate": "float",
+            "risk_multiplier": "float",
+            "min_coverage": "int",
+            "max_coverage": "int",
+            "deductible_options": "int_list"
+        },
+        "references": []
+    },
+    "agents": {
+        "file": "agents.csv",
+        "label": "Agent",
+        "key": "agent_id",
+        "types": {"hire_date": "date", "total_sales_ytd": "float"},
+        "references": [
+            {"column": "branch_id", "target": "branches", "type": "WORKS_AT", "direction": "out"}
+        ]
+    },
+    "customers": {
+        "file": "customers.csv",
+        "label": "Customer",
+        "key": "customer_number",
+        "types": {
+            "date_of_birth": "date",
+            "credit_score": "int",
+            "customer_since": "date",
+            "lifetime_value": "float"
+        },
+        "references": []
+    },
+    "policies": {
+        "file": "policies.csv",
+        "label": "Policy",
+        "key": "policy_number",
+        "types": {
+            "annual_premium": "float",
+            "effective_date": "date",
+            "expiration_date": "date",
+            "coverage_amount": "int",
+            "deductible": "int",
+            "auto_year": "int",
+            "property_value": "int"
+        },
+        # Same secondary label the LOAD CSV guide adds
+        "status_label": {"column": "policy_status", "value": "Active", "label": "Active"},
+        "references": [
+            {"column": "customer_number", "target": "customers", "type": "HOLDS_POLICY", "direction": "in"},
+            # Policies name a product type, not a product: use the type's standard product
+            {"column": "product_type", "target": "products", "type": "BASED_ON", "direction": "out",
+             "target_column": "product_type", "prefer": {"product_name": "Standard"}}
+        ]
+    },
+    "claims": {
+        "file": "claims.csv",
+        "label": "Claim",
+        "key": "claim_number",
+        "types": {
+            "claim_date": "date",
+            "claim_amount": "float",
+            "settled_amount": "float",
+            "filed_date": "date",
+            "settled_date": "date"
+        },
+        "references": [
+            {"column": "policy_number", "target": "policies", "type": "HAS_CLAIM", "direction": "in"}
+        ]
+    }
+}
+
+# Relationship-only files: not part of the shipped sample, but written by
+# generate_dataset.py and loaded when present
+RELATIONSHIP_FILES: Dict[str, Dict[str, Any]] = {
+    "agent_customers": {
+        "file": "agent_customers.csv",
+        "type": "SERVICES",
+        "start": {"file": "agents", "column": "agent_id"},
+        "end": {"file": "customers", "column": "customer_number"},
+        # Few agents, many customers: parallel loads partition on the agent
+        "hub": "start",
+        "types": {"relationship_start": "date"}
+    }
+}
+
+
+def columns(name: str, data_dir: Path = DATA_DIR) -> List[str]:
+    """Header of a shipped CSV file, the reference for generated files"""
+    with open(Path(data_dir) / _spec(name)["file"], newline="", encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+
+# ==========================================
+# Typed conversion
+# ==========================================
+
+CONVERTERS = {
+    "str": str,
+    "int": lambda value: int(float(value)) if "." in value else int(value),
+    "float": float,
+    "date": date.fromisoformat,
+    "int_list": lambda value: [int(item) for item in value.split(",") if item.strip()]
+}
+
+
+def _spec(name: str) -> Dict[str, Any]:
+    return FILES[name] if name in FILES else RELATIONSHIP_FILES[name]
+
+
+def convert_row(name: str, row: Dict[str, str], line: int, converters: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Convert one CSV row to typed values; empty strings become None"""
+    if converters is None:
+        converters = _converters(name)
+    converted = {}
+    for column, value in row.items():
+        value = value.strip() if value is not None else ""
+        if not value:
+            converted[column] = None
+            continue
+        convert = converters.get(column)
+        if convert is None:
+            converted[column] = value
+            continue
+        try:
+            converted[column] = convert(value)
+        except ValueError as e:
+            raise ValueError(f"{_spec(name)['file']}:{line}: bad {column} value {value!r}: {e}") from e
+    return converted
+
+
+def _converters(name: str) -> Dict[str, Any]:
+    # Resolved once per file rather than once per value; strings need no conversion
+    return {column: CONVERTERS[kind] for column, kind in _spec(name)["types"].items() if kind != "str"}
+
+
+def read_rows(name: str, data_dir: Path = DATA_DIR) -> Iterator[Dict[str, Any]]:
+    """Stream typed rows from one CSV file (node or relationship file)"""
+    converters = _converters(name)
+    with open(Path(data_dir) / _spec(name)["file"], newline="", encoding="utf-8") as f:
+        # Line 1 is the header
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            if None in row:
+                # DictReader collects surplus fields under None; they would shift every later column
+                raise ValueError(f"{_spec(name)['file']}:{line}: {len(row[None])} more field(s) than the header")
+            yield convert_row(name, row, line, converters)
+
+
+# ==========================================
+# Load order
+# ==========================================
+
+def load_order(names: List[str] = None) -> List[str]:
+    """Files ordered so every referenced file comes before the files referencing it"""
+    names = list(names or FILES)
+    ordered, visiting = [], set()
+
+    def visit(name):
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"Circular foreign keys involving {name}")
+        visiting.add(name)
+        for reference in FILES[name]["references"]:
+            visit(reference["target"])
+        visiting.discard(name)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def constraint_statements(names: List[str]) -> List[str]:
+    """One uniqueness constraint per file key, named as in BULK_LOAD_GUIDE.md"""
+    return [
+        f"CREATE CONSTRAINT {FILES[name]['key']}_unique IF NOT EXISTS "
+        f"FOR (n:{FILES[name]['label']}) REQUIRE n.{FILES[name]['key']} IS UNIQUE"
+        for name in names
+    ]
+
+
+def reference_lookup(reference: Dict[str, Any], data_dir: Path = DATA_DIR) -> Dict[Any, Any]:
+    """Map a non-key reference column to target keys (e.g. product_type -> product_code)"""
+    target = FILES[reference["target"]]
+    column = reference["target_column"]
+    prefer = reference.get("prefer", {})
+    lookup, preferred = {}, set()
+    for row in read_rows(reference["target"], data_dir):
+        value = row[column]
+        matches = all(text in (row.get(field) or "") for field, text in prefer.items())
+        # First preferred row wins; otherwise the first row with the value
+        if value not in lookup or (matches and value not in preferred):
+            lookup[value] = row[target["key"]]
+            if matches:
+                preferred.add(value)
+    return lookup
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Insurance Dataset - Incremental Lab Data Reload
+Applies the data/lab_XX_data_reload.cypher scripts, skipping those already in the database
+
+Each script's SHA-256 and progress is recorded in a (:DataReload) node, updated
+in the same transaction as the statements it covers. Moving a database from
+lab 3 to lab 6 runs only scripts 4-6, and an interrupted reload resumes where
+it stopped. Usage:
+
+    python data/reload_runner.py --lab 6
+    python data/reload_runner.py --lab 15 --fresh
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from neo4j import GraphDatabase
+
+DATA_DIR = Path(__file__).resolve().parent
+
+NEO4J_CONFIG = {
+    "uri": os.getenv("NEO4J_URI", "neo4j://localhost:7687"),
+    "user": os.getenv("NEO4J_USER", "neo4j"),
+    "password": os.getenv("NEO4J_PASSWORD", "password"),
+    "database": os.getenv("NEO4J_DATABASE", "insurance")
+}
+
+# (script, first lab that needs it). Each script is a delta on the ones before
+# it; lab_07 holds the Lab 15 data (see data/README.md)
+LAB_SCRIPTS: List[Tuple[str, int]] = [
+    ("lab_01_data_reload.cypher", 1),
+    ("lab_02_data_reload.cypher", 2),
+    ("lab_03_data_reload.cypher", 3),
+    ("lab_04_data_reload.cypher", 4),
+    ("lab_05_data_reload.cypher", 5),
+    ("lab_06_data_reload.cypher", 6),
+    ("lab_07_data_reload.cypher", 15)
+]
+
+LEDGER_LABEL = "DataReload"
+STATEMENTS_PER_TRANSACTION = 50
+
+
+def scripts_for_lab(lab: int) -> List[str]:
+    """Reload scripts that make up the data state of a lab, in order"""
+    return [script for script, first_lab in LAB_SCRIPTS if first_lab <= lab]
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+# ==========================================
+# Statement splitting
+# ==========================================
+
+def split_statements(text: str) -> List[str]:
+    """Split a script on semicolons outside strings, backticks and comments; comments are dropped"""
+    statements, current = [], []
+    i, length = 0, len(text)
+    while i < length:
+        char = text[i]
+        if char in "'\"`":
+            # Copy a quoted section verbatim; backslash escapes apply inside strings
+            end = i + 1
+            while end < length and text[end] != char:
+                end += 2 if text[end] == "\\" and char != "`" else 1
+            current.append(text[i:end + 1])
+            i = end + 1
+        elif text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = length if newline == -1 else newline
+        elif text.startswith("/*", i):
+            close = text.find("*/", i + 2)
+            i = length if close == -1 else close + 2
+        elif char == ";":
+            statements.append("".join(current))
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    statements.append("".join(current))
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+STRING_LITERAL = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'")
+SCHEMA = re.compile(r"^(CREATE|DROP)\s+(\w+\s+)?(CONSTRAINT|INDEX)\b", re.IGNORECASE)
+AUTOCOMMIT = re.compile(r"\bIN\s+TRANSACTIONS\b|\bPERIODIC\s+COMMIT\b", re.IGNORECASE)
+WRITES = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|FOREACH|CALL|LOAD\s+CSV)\b", re.IGNORECASE)
+
+
+def statement_kind(statement: str) -> str:
+    """schema and autocommit statements cannot share an explicit transaction with writes"""
+    code = STRING_LITERAL.sub("''", statement)
+    if SCHEMA.match(code):
+        return "schema"
+    if AUTOCOMMIT.search(code):
+        return "autocommit"
+    if not WRITES.search(code):
+        return "read"
+    return "write"
+
+
+def plan_transactions(statements: List[str],
+                      per_transaction: int = STATEMENTS_PER_TRANSACTION) -> List[Tuple[str, List[str]]]:
+    """Group consecutive writes into transactions; other kinds run on their own"""
+    groups: List[Tuple[str, List[str]]] = []
+    for statement in statements:
+        kind = statement_kind(statement)
+        if kind == "write" and groups and groups[-1][0] == "write" and len(groups[-1][1]) < per_transaction:
+            groups[-1][1].append(statement)
+        else:
+            groups.append((kind, [statement]))
+    return groups
+
+
+# ==========================================
+# Runner
+# ==========================================
+
+class ReloadRunner:
+    """Applies reload scripts in order, recording each in the database it changes"""
+
+    LEDGER_UPDATE = (
+        f"MERGE (r:{LEDGER_LABEL} {{script: $script}}) "
+        f"SET r.sha256 = $sha256, r.groups = $groups, r.completed = $completed, r.updated_at = datetime()"
+    )
+
+    def __init__(self, driver, database: str, data_dir: Path = DATA_DIR,
+                 per_transaction: int = STATEMENTS_PER_TRANSACTION, verify: bool = False, progress=print):
+        self.driver = driver
+        self.database = database
+        self.data_dir = Path(data_dir)
+        self.per_transaction = per_transaction
+        self.verify = verify
+        self.progress = progress or (lambda message: None)
+
+    def ledger(self) -> Dict[str, Dict[str, Any]]:
+        with self.driver.session(database=self.database) as session:
+            result = session.run(
+                f"MATCH (r:{LEDGER_LABEL}) RETURN r.script AS script, r.sha256 AS sha256, "
+                f"r.groups AS groups, r.completed AS completed"
+            )
+            return {record["script"]: dict(record) for record in result}
+
+    def reset(self):
+        """Delete all data, constraints and indexes, as the test suite's clear_database does"""
+        with self.driver.session(database=self.database) as session:
+            session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+            for record in list(session.run("SHOW CONSTRAINTS YIELD name RETURN name")):
+                session.run(f"DROP CONSTRAINT `{record['name']}` IF EXISTS").consume()
+            # Token lookup indexes back every label scan and are not lab data
+            for record in list(session.run("SHOW INDEXES YIELD name, type WHERE type <> 'LOOKUP' RETURN name")):
+                session.run(f"DROP INDEX `{record['name']}` IF EXISTS").consume()
+        self.progress("✓ Database cleared")
+
+    def _check(self, scripts: List[str], ledger: Dict[str, Dict[str, Any]]):
+        """Refuse to move backwards or to build on a script that changed since it was applied"""
+        ahead = [script for script in ledger if script not in scripts]
+        if ahead:
+            raise RuntimeError(f"Database already has {', '.join(sorted(ahead))}, which the target state "
+                               f"does not include - rebuild with --fresh")
+        for script in scripts:
+            entry = ledger.get(script)
+            if entry and entry["sha256"] != file_sha256(self.data_dir / script):
+                raise RuntimeError(f"{script} changed since it was applied - rebuild with --fresh")
+
+    def _run_group(self, session, script: str, sha256: str, kind: str, statements: List[str],
+                   completed: int, groups: int):
+        ledger = {"script": script, "sha256": sha256, "groups": groups, "completed": completed}
+        if kind == "write":
+            def work(tx):
+                for statement in statements:
+                    tx.run(statement).consume()
+                tx.run(self.LEDGER_UPDATE, **ledger).consume()
+            session.execute_write(work)
+            return
+        # Schema changes and CALL ... IN TRANSACTIONS must run as auto-commit
+        # statements, so their ledger entry follows in its own transaction.
+        # Reads are the scripts' verification queries and only run with verify
+        for statement in statements if kind != "read" or self.verify else []:
+            result = session.run(statement)
+            if kind == "read":
+                for record in result:
+                    self.progress(f"    {dict(record)}")
+            else:
+                result.consume()
+        session.execute_write(lambda tx: tx.run(self.LEDGER_UPDATE, **ledger).consume())
+
+    def apply(self, script: str, entry: Dict[str, Any] = None) -> Dict[str, Any]:
+        path = self.data_dir / script
+        sha256 = file_sha256(path)
+        groups = plan_transactions(split_statements(path.read_text(encoding="utf-8")), self.per_transaction)
+        done = entry["completed"] if entry else 0
+        if entry and done >= entry["groups"]:
+            return {"script": script, "status": "skipped", "transactions": 0, "seconds": 0.0}
+        if done and entry["groups"] != len(groups):
+            raise RuntimeError(f"{script} was interrupted under a different --statements-per-transaction; "
+                               f"resume with the same value or rebuild with --fresh")
+
+        started = time.perf_counter()
+        with self.driver.session(database=self.database) as session:
+            for position in range(done, len(groups)):
+                kind, statements = groups[position]
+                self._run_group(session, script, sha256, kind, statements, position + 1, len(groups))
+        elapsed = time.perf_counter() - started
+        status = "resumed" if done else "applied"
+        self.progress(f"  ✓ {script}: {status}, {len(groups) - done} transaction(s) in {elapsed:.2f}s")
+        return {"script": script, "status": status, "transactions": len(groups) - done, "seconds": elapsed}
+
+    def run(self, lab: int, fresh: bool = False) -> List[Dict[str, Any]]:
+        """Bring the database to the data state of a lab"""
+        scripts = scripts_for_lab(lab)
+        if fresh:
+            self.reset()
+        ledger = self.ledger()
+        self._check(scripts, ledger)
+        results = [self.apply(script, ledger.get(script)) for script in scripts]
+        skipped = sum(1 for result in results if result["status"] == "skipped")
+        self.progress(f"✓ Lab {lab} data state ready ({len(results) - skipped} applied, {skipped} already present)")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the lab data reload scripts incrementally")
+    parser.add_argument("--lab", type=int, required=True, help="Target lab; its scripts and all earlier ones are applied")
+    parser.add_argument("--fresh", action="store_true", help="Clear the database first")
+    parser.add_argument("--verify", action="store_true", help="Also run the scripts' verification queries")
+    parser.add_argument("--statements-per-transaction", type=int, default=STATEMENTS_PER_TRANSACTION)
+    parser.add_argument("--database", default=NEO4J_CONFIG["database"])
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(NEO4J_CONFIG["uri"], auth=(NEO4J_CONFIG["user"], NEO4J_CONFIG["password"]))
+    try:
+        driver.verify_connectivity()
+        print(f"✓ Connected to Neo4j at {NEO4J_CONFIG['uri']}")
+        runner = ReloadRunner(driver, args.database, per_transaction=args.statements_per_transaction,
+                              verify=args.verify)
+        runner.run(args.lab, fresh=args.fresh)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
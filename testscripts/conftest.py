@@ -9,6 +9,10 @@ from typing import Generator, Dict, Any
 import os
 from datetime import datetime
 
+from neo4j.exceptions import ClientError
+
+from lab_snapshots import LabSnapshots, clear_snapshots, create_database, worker_database
+
 
 # ==========================================
 # Neo4j Connection Configuration
@@ -50,13 +54,28 @@ def neo4j_driver():
     print("\n✓ Neo4j connection closed")
 
 
+@pytest.fixture(scope="session")
+def lab_database(neo4j_driver):
+    """
+    Database the fixtures work in: the insurance database, or one per
+    pytest-xdist worker so parallel workers never share lab state.
+    """
+    database = worker_database(NEO4J_CONFIG["database"], "labstages")
+    if database != NEO4J_CONFIG["database"]:
+        try:
+            create_database(neo4j_driver, database)
+        except ClientError as e:
+            pytest.fail(f"Parallel runs need one database per worker (Neo4j Enterprise): {e}")
+    return database
+
+
 @pytest.fixture(scope="function")
-def neo4j_session(neo4j_driver):
+def neo4j_session(neo4j_driver, lab_database):
     """
     Create a Neo4j session for each test function.
-    Automatically uses the insurance database.
+    Automatically uses the insurance database (or this worker's copy).
     """
-    with neo4j_driver.session(database=NEO4J_CONFIG["database"]) as session:
+    with neo4j_driver.session(database=lab_database) as session:
         yield session
 
 
@@ -74,6 +93,25 @@ def query_executor(neo4j_session):
     return execute_query
 
 
+@pytest.fixture(scope="session")
+def lab_snapshots(neo4j_driver, lab_database):
+    """
+    Snapshot cache of lab data states, shared by the whole session.
+    Snapshots are built on first use and kept in testscripts/.snapshots.
+    --rebuild-snapshots clears them once, in pytest_configure.
+    """
+    return LabSnapshots(neo4j_driver, lab_database)
+
+
+@pytest.fixture(scope="function")
+def lab_stage(lab_snapshots):
+    """
+    Restores the database to a lab stage, e.g. lab_stage("lab_07").
+    The first request for a stage replays the reload scripts; later ones restore the snapshot.
+    """
+    return lab_snapshots.restore
+
+
 # ==========================================
 # Database State Validation Helpers
 # ==========================================
@@ -190,6 +228,20 @@ def test_report():
 # Pytest Hooks for Custom Reporting
 # ==========================================
 
+def pytest_configure(config):
+    # Registered here so the mark is known when pytest-xdist is not installed
+    config.addinivalue_line("markers", "xdist_group(name): run tests of the same group on one xdist worker")
+
+    # Only the controller (or a serial run) clears, before any worker starts
+    if config.getoption("--rebuild-snapshots") and not hasattr(config, "workerinput"):
+        clear_snapshots()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--rebuild-snapshots", action="store_true", default=False,
+                     help="Discard cached lab stage snapshots and rebuild them from the reload scripts")
+
+
 def pytest_runtest_logreport(report):
     """Hook to track test results"""
     if report.when == "call":
@@ -0,0 +1,209 @@
+"""
+Neo4j Mastering Course - Lab Stage Snapshots
+Captures the database state of each lab stage once and restores it in seconds
+"""
+
+import gzip
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Union
+
+import neo4j
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR.parent / "data"))
+
+from reload_runner import DATA_DIR, ReloadRunner, file_sha256, scripts_for_lab  # noqa: E402
+
+SNAPSHOT_DIR = Path(os.getenv("LAB_SNAPSHOT_DIR", SCRIPT_DIR / ".snapshots"))
+
+# Bump when the snapshot layout changes; older files are rebuilt
+SNAPSHOT_FORMAT = 1
+BATCH_SIZE = 5000
+
+# Nodes are tagged while restoring, so relationships can find their endpoints by index
+RESTORE_LABEL = "_SnapshotNode"
+RESTORE_KEY = "_snapshot_id"
+
+
+def worker_database(default: str, prefix: str) -> str:
+    """Database for this pytest-xdist worker ("<prefix>-gw0"), or default when running serially"""
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    return f"{prefix}-{worker}" if worker else default
+
+
+def create_database(driver, name: str):
+    """Create a database if it does not exist yet (Neo4j Enterprise); raises ClientError otherwise"""
+    with driver.session(database="system") as session:
+        session.run(f"CREATE DATABASE `{name}` IF NOT EXISTS WAIT").consume()
+
+
+def clear_snapshots(directory: Path = SNAPSHOT_DIR):
+    """Delete every cached snapshot; call from one process only, never from parallel workers"""
+    for path in Path(directory).glob("*.pkl.gz"):
+        path.unlink(missing_ok=True)
+
+
+def stage_lab(stage: Union[str, int]) -> int:
+    """Lab number of a stage name: "lab_07", "lab_7" or 7"""
+    if isinstance(stage, int):
+        return stage
+    match = re.fullmatch(r"(?:lab_?)?0*(\d+)", str(stage).strip().lower())
+    if not match:
+        raise ValueError(f"Unknown lab stage {stage!r} - use a name like 'lab_07'")
+    return int(match.group(1))
+
+
+class LabSnapshots:
+    """Cache of one logical snapshot per distinct lab data state
+
+    Stages that share their reload scripts (labs 6-14 all use scripts 1-6)
+    share one snapshot. The file name carries a digest of the scripts, so
+    editing a script invalidates every snapshot that contains it.
+    """
+
+    def __init__(self, driver, database: str, directory: Path = SNAPSHOT_DIR, progress=print):
+        self.driver = driver
+        self.database = database
+        self.directory = Path(directory)
+        self.progress = progress or (lambda message: None)
+        self.runner = ReloadRunner(driver, database, progress=self.progress)
+
+    def snapshot_path(self, name: str, inputs: List[Path]) -> Path:
+        """Cache file for a state built from the given input files"""
+        digest = hashlib.sha256()
+        digest.update(f"{SNAPSHOT_FORMAT}:{neo4j.__version__}".encode())
+        for path in inputs:
+            digest.update(f"{Path(path).name}:{file_sha256(path)}".encode())
+        return self.directory / f"{name}-{digest.hexdigest()[:16]}.pkl.gz"
+
+    def path(self, lab: int) -> Path:
+        scripts = scripts_for_lab(lab)
+        name = Path(scripts[-1]).stem if scripts else "empty"
+        return self.snapshot_path(name, [DATA_DIR / script for script in scripts])
+
+    # ---- capture ----
+
+    def capture(self, path: Path) -> Path:
+        """Write the current database state to a snapshot file"""
+        started = time.perf_counter()
+        ids: Dict[str, int] = {}
+        nodes: Dict[tuple, List[Dict[str, Any]]] = {}
+        relationships: Dict[str, List[Dict[str, Any]]] = {}
+        with self.driver.session(database=self.database) as session:
+            with session.begin_transaction() as tx:
+                for record in tx.run("MATCH (n) RETURN elementId(n) AS id, labels(n) AS labels, "
+                                     "properties(n) AS props"):
+                    ids[record["id"]] = len(ids)
+                    nodes.setdefault(tuple(sorted(record["labels"])), []).append(
+                        {"id": ids[record["id"]], "props": record["props"]})
+                for record in tx.run("MATCH (a)-[r]->(b) RETURN elementId(a) AS a, type(r) AS type, "
+                                     "elementId(b) AS b, properties(r) AS props"):
+                    relationships.setdefault(record["type"], []).append(
+                        {"a": ids[record["a"]], "b": ids[record["b"]], "props": record["props"]})
+                # Indexes that back a constraint are recreated by the constraint
+                schema = [r["statement"] for r in tx.run(
+                    "SHOW CONSTRAINTS YIELD createStatement RETURN createStatement AS statement")]
+                schema += [r["statement"] for r in tx.run(
+                    "SHOW INDEXES YIELD createStatement, owningConstraint, type "
+                    "WHERE owningConstraint IS NULL AND type <> 'LOOKUP' "
+                    "RETURN createStatement AS statement")]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot = {"format": SNAPSHOT_FORMAT, "schema": schema, "nodes": nodes, "relationships": relationships}
+        # Pickle keeps driver temporal and spatial values as they are; the file
+        # is a local cache keyed by driver version, never shared. Parallel
+        # workers may capture the same stage, so each writes a file of its own
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(temporary, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self.progress(f"✓ Snapshot {path.name} captured: {len(ids):,} nodes, "
+                      f"{sum(len(rows) for rows in relationships.values()):,} relationships "
+                      f"in {time.perf_counter() - started:.2f}s")
+        return path
+
+    # ---- restore ----
+
+    @staticmethod
+    def _batches(rows: List[Dict[str, Any]]):
+        for start in range(0, len(rows), BATCH_SIZE):
+            yield rows[start:start + BATCH_SIZE]
+
+    def _load(self, path: Path):
+        started = time.perf_counter()
+        with gzip.open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        self.runner.reset()
+        with self.driver.session(database=self.database) as session:
+            session.run(f"CREATE INDEX snapshot_restore IF NOT EXISTS "
+                        f"FOR (n:`{RESTORE_LABEL}`) ON (n.`{RESTORE_KEY}`)").consume()
+            session.run("CALL db.awaitIndexes()").consume()
+
+            for labels, rows in snapshot["nodes"].items():
+                label_expression = "".join(f":`{label}`" for label in (RESTORE_LABEL, *labels))
+                statement = (f"UNWIND $rows AS row CREATE (n{label_expression}) "
+                             f"SET n = row.props, n.`{RESTORE_KEY}` = row.id")
+                for batch in self._batches(rows):
+                    session.execute_write(lambda tx: tx.run(statement, rows=batch).consume())
+
+            for rel_type, rows in snapshot["relationships"].items():
+                statement = (f"UNWIND $rows AS row "
+                             f"MATCH (a:`{RESTORE_LABEL}` {{`{RESTORE_KEY}`: row.a}}) "
+                             f"MATCH (b:`{RESTORE_LABEL}` {{`{RESTORE_KEY}`: row.b}}) "
+                             f"CREATE (a)-[r:`{rel_type}`]->(b) SET r = row.props")
+                for batch in self._batches(rows):
+                    session.execute_write(lambda tx: tx.run(statement, rows=batch).consume())
+
+            session.run(f"MATCH (n:`{RESTORE_LABEL}`) CALL {{ WITH n REMOVE n:`{RESTORE_LABEL}`, "
+                        f"n.`{RESTORE_KEY}` }} IN TRANSACTIONS OF {BATCH_SIZE} ROWS").consume()
+            session.run("DROP INDEX snapshot_restore IF EXISTS").consume()
+
+            # Schema last: building an index once is cheaper than maintaining it per insert
+            for statement in snapshot["schema"]:
+                session.run(statement).consume()
+            session.run("CALL db.awaitIndexes()").consume()
+        self.progress(f"✓ Restored {path.name} in {time.perf_counter() - started:.2f}s")
+
+    def _restore_cached(self, path: Path) -> bool:
+        if not path.exists():
+            return False
+        try:
+            self._load(path)
+            return True
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            self.progress(f"⚠️ Unreadable snapshot {path.name} ({e}), rebuilding")
+            return False
+
+    def cached(self, name: str, inputs: List[Path], build: Callable[[], None], rebuild: bool = False) -> Path:
+        """Restore a state built by build() from inputs, running build() only when the cache misses"""
+        path = self.snapshot_path(name, inputs)
+        if not rebuild and self._restore_cached(path):
+            return path
+        build()
+        return self.capture(path)
+
+    def restore(self, stage: Union[str, int], rebuild: bool = False) -> Path:
+        """Put the database in a lab stage's state, building and caching the snapshot on first use"""
+        lab = stage_lab(stage)
+        path = self.path(lab)
+        if not rebuild and self._restore_cached(path):
+            return path
+
+        # Start from the nearest earlier cached stage and replay only the missing scripts
+        base = next((earlier for earlier in range(lab - 1, 0, -1)
+                     if not rebuild and self.path(earlier).exists()), None)
+        if base is not None:
+            self._load(self.path(base))
+            self.runner.run(lab)
+        else:
+            self.runner.run(lab, fresh=True)
+        return self.capture(path)
+
+    def clear(self):
+        clear_snapshots(self.directory)
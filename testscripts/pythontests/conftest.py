@@ -6,6 +6,7 @@ import pytest
 from neo4j import GraphDatabase
 import os
 import logging
+import uuid
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,27 +39,122 @@ def neo4j_driver():
     logger.info("Neo4j driver closed")
 
 
+class RollbackSession:
+    """
+    Session stand-in that runs every query in one explicit transaction.
+
+    The transaction is always rolled back when the test ends, so nothing a
+    test writes is ever committed. Code written against a session
+    (run, execute_read, execute_write) works unchanged.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._tx = session.begin_transaction()
+
+    def run(self, query, parameters=None, **kwargs):
+        return self._tx.run(query, parameters, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self._tx, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self._tx, *args, **kwargs)
+
+    def begin_transaction(self, *args, **kwargs):
+        raise RuntimeError(
+            "Tests that manage their own transactions need real commits: "
+            "mark them with @pytest.mark.commits"
+        )
+
+    def close(self):
+        """The fixture owns the session; services closing it is harmless."""
+
+    def rollback(self):
+        if self._tx.closed():
+            return
+        self._tx.rollback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RollbackDriver:
+    """Driver stand-in whose sessions all share the test's rollback transaction."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def session(self, **kwargs):
+        return self._session
+
+    def verify_connectivity(self, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
 @pytest.fixture(scope="function")
-def neo4j_session(neo4j_driver):
-    """Provide a Neo4j session for each test function."""
+def neo4j_session(request, neo4j_driver):
+    """
+    Provide a Neo4j session for each test function.
+
+    Everything the test runs is rolled back afterwards. Tests marked
+    @pytest.mark.commits get a real session and clean up by test_tag.
+    """
     with neo4j_driver.session(database=NEO4J_DATABASE) as session:
-        yield session
+        if request.node.get_closest_marker("commits"):
+            yield session
+            return
+
+        isolated = RollbackSession(session)
+        try:
+            yield isolated
+        finally:
+            isolated.rollback()
 
 
 @pytest.fixture(scope="function")
-def clean_test_data(neo4j_session):
-    """Clean test data before and after each test."""
-    # Clean before test
-    neo4j_session.run("MATCH (n:TestNode) DETACH DELETE n")
-    neo4j_session.run("MATCH (n:TestCustomer) DETACH DELETE n")
-    neo4j_session.run("MATCH (n:TestPolicy) DETACH DELETE n")
+def isolated_driver(request, neo4j_session):
+    """
+    Driver for services that open their own sessions; they all share the
+    test's rollback transaction.
+    """
+    if request.node.get_closest_marker("commits"):
+        pytest.fail("isolated_driver rolls back everything; tests marked commits use neo4j_driver")
+    return RollbackDriver(neo4j_session)
 
-    yield
 
-    # Clean after test
-    neo4j_session.run("MATCH (n:TestNode) DETACH DELETE n")
-    neo4j_session.run("MATCH (n:TestCustomer) DETACH DELETE n")
-    neo4j_session.run("MATCH (n:TestPolicy) DETACH DELETE n")
+@pytest.fixture(scope="function")
+def test_tag(neo4j_driver):
+    """
+    Label unique to this test, for tests that commit data.
+
+    Nodes created with it are deleted after the test. The delete walks one
+    label, not every test label in the database.
+    """
+    tag = f"TestRun_{uuid.uuid4().hex[:12]}"
+    yield tag
+    with neo4j_driver.session(database=NEO4J_DATABASE) as session:
+        session.run(f"MATCH (n:`{tag}`) DETACH DELETE n").consume()
+
+
+@pytest.fixture(scope="function")
+def clean_test_data(request):
+    """
+    Keep each test's data out of the database.
+
+    Rollback isolation already discards everything, so only tests marked
+    @pytest.mark.commits have cleanup to do, by their test_tag. Leftovers
+    from earlier runs are purged once per session.
+    """
+    if request.node.get_closest_marker("commits"):
+        request.getfixturevalue("test_tag")
+    yield
 
 
 @pytest.fixture(scope="session")
@@ -82,8 +178,21 @@ def verify_neo4j_plugins(neo4j_driver):
             logger.warning(f"⚠ GDS plugin not available: {e}")
 
 
+@pytest.fixture(scope="session")
+def purge_committed_test_data(neo4j_driver):
+    """
+    Delete committed test data once, before the suite runs.
+
+    Rollback isolation never commits, but data left by older runs or by an
+    interrupted commits test would still show up in the tests' exact counts.
+    """
+    with neo4j_driver.session(database=NEO4J_DATABASE) as session:
+        for label in ("TestNode", "TestCustomer", "TestPolicy"):
+            session.run(f"MATCH (n:{label}) DETACH DELETE n").consume()
+
+
 @pytest.fixture(scope="session", autouse=True)
-def setup_test_environment(verify_neo4j_plugins):
+def setup_test_environment(verify_neo4j_plugins, purge_committed_test_data):
     """Set up test environment before running tests."""
     logger.info("=" * 80)
     logger.info("PYTHON LABS TEST SUITE - Labs 12-17")
@@ -97,12 +97,13 @@ class TestLab12PythonDriver:
 
     @pytest.mark.lab12
     @pytest.mark.driver
-    def test_transaction_rollback(self, neo4j_driver, clean_test_data):
+    @pytest.mark.commits
+    def test_transaction_rollback(self, neo4j_driver, test_tag):
         """Test transaction rollback on error"""
         with neo4j_driver.session() as session:
             try:
                 with session.begin_transaction() as tx:
-                    tx.run("CREATE (n:TestNode {name: 'Temp'})")
+                    tx.run(f"CREATE (n:TestNode:`{test_tag}` {{name: 'Temp'}})")
                     # Force an error
                     tx.run("INVALID CYPHER QUERY")
                     tx.commit()
@@ -112,7 +113,7 @@ class TestLab12PythonDriver:
         # Verify node was NOT created (transaction rolled back)
         with neo4j_driver.session() as session:
             result = session.run(
-                "MATCH (n:TestNode {name: 'Temp'}) RETURN count(n) AS count"
+                f"MATCH (n:TestNode:`{test_tag}` {{name: 'Temp'}}) RETURN count(n) AS count"
             )
             assert result.single()["count"] == 0
 
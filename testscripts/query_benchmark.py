@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Neo4j Mastering Course - Query Cost Benchmark
+Profiles every executable lab query and compares its cost against a recorded baseline
+
+Each lab starts from the Labs 1-3 base data, as in the test suite, and its
+queries run in order under PROFILE. Reads repeat in place; writes repeat in
+transactions that are rolled back, and only the last run commits, so the
+data each later query sees matches a normal test run. Usage:
+
+    python query_benchmark.py --record          # write query_cost_baseline.json
+    python query_benchmark.py                   # compare, exit 1 on regressions
+    python query_benchmark.py -k lab_8 --repeats 10
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError, ServiceUnavailable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "data"))
+
+from reload_runner import statement_kind  # noqa: E402
+from test_comprehensive_lab_queries import (  # noqa: E402
+    ALL_LABS, NEO4J_DATABASE, NEO4J_PASSWORD, NEO4J_URI, NEO4J_USER, SCRIPT_DIR,
+    clean_cypher, is_executable_query, restore_base_data
+)
+
+BASELINE_FILE = SCRIPT_DIR / "query_cost_baseline.json"
+BASELINE_FORMAT = 1
+
+REPEATS = 5
+WARMUP = 1
+
+# Relative growth allowed before a query counts as regressed, and the absolute
+# change below which a metric is noise however large the ratio
+TOLERANCE = 0.10
+TIME_TOLERANCE = 0.50
+FLOORS = {"db_hits": 100, "memory_bytes": 64 * 1024, "wall_ms_p50": 10.0}
+
+# PROFILE only applies to queries that produce an execution plan
+NOT_PROFILED = re.compile(
+    r"^(SHOW|PROFILE|EXPLAIN|USE|ALTER|START|STOP|GRANT|DENY|REVOKE|"
+    r"(CREATE|DROP)\s+(OR\s+REPLACE\s+)?(COMPOSITE\s+)?(DATABASE|ALIAS|USER|ROLE))\b",
+    re.IGNORECASE
+)
+# Procedures whose effects live outside the transaction (the GDS graph catalog,
+# background jobs) cannot be repeated or rolled back, so they run once
+EXTERNAL_EFFECTS = re.compile(r"\bCALL\s+(gds|apoc\.periodic|db|dbms)\.", re.IGNORECASE)
+
+
+def query_id(lab_name: str, query_num: int) -> str:
+    """Same id as the test suite's parametrized tests"""
+    return f"{lab_name}-Q{query_num}"
+
+
+def profile_mode(cypher: str) -> Optional[str]:
+    """read or write (repeated), once, or None for statements PROFILE cannot run"""
+    kind = statement_kind(cypher)
+    if kind in ("schema", "autocommit") or NOT_PROFILED.match(cypher):
+        return None
+    if EXTERNAL_EFFECTS.search(cypher):
+        return "once"
+    return kind
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def plan_costs(plan: Dict[str, Any]) -> Dict[str, int]:
+    """Totals over a profiled plan; rows and memory are the root operator's"""
+    costs = {"db_hits": 0, "page_cache_hits": 0, "page_cache_misses": 0,
+             "rows": plan.get("rows", 0), "memory_bytes": plan.get("args", {}).get("GlobalMemory", 0)}
+    stack = [plan]
+    while stack:
+        operator = stack.pop()
+        costs["db_hits"] += operator.get("dbHits", 0)
+        costs["page_cache_hits"] += operator.get("pageCacheHits", 0)
+        costs["page_cache_misses"] += operator.get("pageCacheMisses", 0)
+        stack.extend(operator.get("children", []))
+    return costs
+
+
+# ==========================================
+# Profiling
+# ==========================================
+
+class QueryBenchmark:
+    """Runs lab queries under PROFILE and aggregates their cost over repeats"""
+
+    def __init__(self, driver, database: str, repeats: int = REPEATS, warmup: int = WARMUP, progress=print):
+        self.driver = driver
+        self.database = database
+        self.repeats = repeats
+        self.warmup = warmup
+        self.progress = progress or (lambda message: None)
+
+    def _profile_once(self, session, statement: str, commit: Optional[bool]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        if commit is None:
+            summary = session.run(statement).consume()
+        else:
+            with session.begin_transaction() as tx:
+                summary = tx.run(statement).consume()
+                if commit:
+                    tx.commit()
+                else:
+                    tx.rollback()
+        costs = plan_costs(summary.profile or {})
+        costs["wall_ms"] = (time.perf_counter() - started) * 1000
+        return costs
+
+    def profile(self, session, cypher: str) -> Dict[str, Any]:
+        mode = profile_mode(cypher)
+        if mode is None:
+            session.run(cypher).consume()
+            return {"mode": "unprofiled"}
+
+        statement = f"PROFILE {cypher}"
+        if mode == "once":
+            runs = [self._profile_once(session, statement, commit=None)]
+        elif mode == "read":
+            for _ in range(self.warmup):
+                self._profile_once(session, statement, commit=None)
+            runs = [self._profile_once(session, statement, commit=None) for _ in range(self.repeats)]
+        else:
+            # Every run but the last is rolled back; the last one commits
+            for _ in range(self.warmup):
+                self._profile_once(session, statement, commit=False)
+            runs = [self._profile_once(session, statement, commit=run == self.repeats - 1)
+                    for run in range(self.repeats)]
+
+        wall = [run["wall_ms"] for run in runs]
+        result = {"mode": mode, "runs": len(runs)}
+        for metric in ("db_hits", "rows", "page_cache_hits", "page_cache_misses", "memory_bytes"):
+            result[metric] = int(percentile([run[metric] for run in runs], 0.5))
+        result.update({"wall_ms_p50": round(percentile(wall, 0.5), 3),
+                       "wall_ms_p95": round(percentile(wall, 0.95), 3),
+                       "wall_ms_max": round(max(wall), 3)})
+        return result
+
+    def run(self, labs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Profile every executable query of the given labs, each lab from the base data"""
+        results = {}
+        for lab in labs:
+            restore_base_data(self.driver, self.database)
+            started = time.perf_counter()
+            with self.driver.session(database=self.database) as session:
+                for query_num, raw_query in lab["queries"]:
+                    cleaned = clean_cypher(raw_query)
+                    if not is_executable_query(cleaned):
+                        continue
+                    entry = {"sha256": hashlib.sha256(cleaned.encode("utf-8")).hexdigest()[:16]}
+                    try:
+                        entry.update(self.profile(session, cleaned))
+                    except Neo4jError as e:
+                        # Recorded, not raised: the test suite decides which errors are acceptable
+                        entry.update({"mode": "error", "error": (e.message or str(e))[:200]})
+                    results[query_id(lab["name"], query_num)] = entry
+            self.progress(f"  ✓ {lab['name']}: {len(lab['queries'])} queries in "
+                          f"{time.perf_counter() - started:.2f}s")
+        return results
+
+
+# ==========================================
+# Baseline comparison
+# ==========================================
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            tolerance: float = TOLERANCE, time_tolerance: float = TIME_TOLERANCE) -> Dict[str, List]:
+    """Classify every query present in both runs; regressions exceed both tolerance and floor"""
+    limits = {"db_hits": tolerance, "memory_bytes": tolerance, "wall_ms_p50": time_tolerance}
+    regressions, movers, changed, rows_changed = [], [], [], []
+    for qid, now in current.items():
+        before = baseline.get(qid)
+        if not before or "db_hits" not in before or "db_hits" not in now:
+            continue
+        if before["sha256"] != now["sha256"]:
+            changed.append(qid)
+            continue
+        if before["rows"] != now["rows"]:
+            rows_changed.append((qid, before["rows"], now["rows"]))
+        for metric, limit in limits.items():
+            if limit is None:
+                continue
+            old, new = before[metric], now[metric]
+            if new - old > FLOORS[metric] and new > old * (1 + limit):
+                regressions.append((qid, metric, old, new))
+        movers.append((qid, before["db_hits"], now["db_hits"], before["wall_ms_p50"], now["wall_ms_p50"]))
+
+    # Biggest relative change in db hits first; +1 keeps zero-hit queries comparable
+    movers.sort(key=lambda m: abs((m[2] + 1) / (m[1] + 1) - 1), reverse=True)
+    return {"regressions": regressions, "movers": movers, "changed": changed, "rows_changed": rows_changed,
+            "missing": sorted(set(baseline) - set(current))}
+
+
+def print_comparison(comparison: Dict[str, List], top: int = 10):
+    width = 80
+    print("\n" + "=" * width)
+    print("QUERY COST COMPARISON")
+    print("=" * width)
+    movers = [m for m in comparison["movers"] if m[1] != m[2]][:top]
+    if movers:
+        print(f"{'Biggest movers (db hits)':<46}{'Before':>10}{'After':>10}{'p50 ms':>14}")
+        for qid, old_hits, new_hits, old_ms, new_ms in movers:
+            print(f"{qid[-46:]:<46}{old_hits:>10,}{new_hits:>10,}{f'{old_ms:.1f}→{new_ms:.1f}':>14}")
+    else:
+        print("No db hit changes")
+
+    for title, key in (("Query text changed (not compared)", "changed"), ("Missing from this run", "missing")):
+        if comparison[key]:
+            print(f"\n{title}: {len(comparison[key])}")
+            for qid in comparison[key][:top]:
+                print(f"  {qid}")
+    if comparison["rows_changed"]:
+        print(f"\n⚠️ Row counts changed: {len(comparison['rows_changed'])}")
+        for qid, old, new in comparison["rows_changed"][:top]:
+            print(f"  {qid}: {old:,} → {new:,}")
+
+    print()
+    if comparison["regressions"]:
+        print(f"✗ {len(comparison['regressions'])} regression(s)")
+        for qid, metric, old, new in comparison["regressions"]:
+            print(f"  {qid}: {metric} {old:,} → {new:,}")
+    else:
+        print("✓ No regressions")
+    print("=" * width)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the lab queries and compare them against a baseline")
+    parser.add_argument("--record", action="store_true", help="Write the baseline instead of comparing")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--output", type=Path, help="Also write this run's results here")
+    parser.add_argument("-k", dest="lab_filter", help="Only labs whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Allowed relative growth in db hits and memory")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="Allowed relative growth in p50 wall time; negative disables the check")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--database", default=NEO4J_DATABASE)
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    labs = [lab for lab in ALL_LABS if not args.lab_filter or args.lab_filter in lab["name"]]
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        driver.verify_connectivity()
+        server = driver.get_server_info().agent
+        print(f"✓ Connected to {server} at {NEO4J_URI}")
+        benchmark = QueryBenchmark(driver, args.database, repeats=args.repeats, warmup=args.warmup)
+        results = benchmark.run(labs)
+    except ServiceUnavailable:
+        print("✗ Neo4j is not accessible. Start with: cd ../mac && ./start-neo4j.sh")
+        sys.exit(1)
+    finally:
+        driver.close()
+
+    document = {"format": BASELINE_FORMAT, "recorded_at": datetime.now(timezone.utc).isoformat(),
+                "server": server, "repeats": args.repeats, "queries": results}
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.record:
+        if args.lab_filter and args.baseline.exists():
+            # A partial run only replaces the labs it covered
+            previous = json.loads(args.baseline.read_text(encoding="utf-8"))["queries"]
+            document["queries"] = {**previous, **results}
+        args.baseline.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        profiled = sum(1 for entry in results.values() if "db_hits" in entry)
+        print(f"✓ Baseline {args.baseline.name} recorded: {profiled} profiled queries")
+        return
+
+    if not args.baseline.exists():
+        print(f"✗ No baseline at {args.baseline} - record one with --record")
+        sys.exit(1)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("format") != BASELINE_FORMAT:
+        print(f"✗ {args.baseline.name} has an older format - record it again with --record")
+        sys.exit(1)
+    if baseline.get("server") != server:
+        print(f"⚠️ Baseline was recorded on {baseline.get('server')}, this run is on {server}")
+
+    if args.lab_filter:
+        baseline["queries"] = {qid: entry for qid, entry in baseline["queries"].items()
+                               if any(qid.startswith(f"{lab['name']}-Q") for lab in labs)}
+    comparison = compare(baseline["queries"], results, args.tolerance,
+                         args.time_tolerance if args.time_tolerance >= 0 else None)
+    print_comparison(comparison, args.top)
+    sys.exit(1 if comparison["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -43,8 +43,13 @@ echo "Running comprehensive test suite..."
 echo "================================================================================"
 echo ""
 
-# Run comprehensive test suite
-pytest test_comprehensive_lab_queries.py -v --tb=short
+# Run comprehensive test suite, one worker per core when pytest-xdist is installed.
+# Each worker tests against a database of its own; TEST_WORKERS=1 runs serially
+PARALLEL=""
+if [ "${TEST_WORKERS:-auto}" != "1" ] && python3 -c "import xdist" 2>/dev/null; then
+    PARALLEL="-n ${TEST_WORKERS:-auto} --dist loadgroup"
+fi
+pytest test_comprehensive_lab_queries.py -v --tb=short $PARALLEL
 
 # Capture exit code
 EXIT_CODE=$?
@@ -3,6 +3,9 @@ Comprehensive Lab Query Test Suite - 100% Coverage, 100% Pass Rate
 Tests EVERY Cypher query from all lab markdown files with intelligent data loading.
 """
 
+import hashlib
+import json
+import os
 import pytest
 import re
 from pathlib import Path
@@ -11,6 +14,8 @@ from neo4j import GraphDatabase
 from neo4j.exceptions import ClientError, ServiceUnavailable
 from _pytest.outcomes import Skipped
 
+from lab_snapshots import LabSnapshots, create_database, worker_database
+
 
 # Get lab directory path
 SCRIPT_DIR = Path(__file__).parent
@@ -22,15 +27,44 @@ NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "password"
 NEO4J_DATABASE = "neo4j"
 
+# Labs whose data creation queries make up the base data for every test
+BASE_DATA_LABS = ['neo4j_lab_1_enterprise_setup',
+                  'neo4j_lab_2_cypher_fundamentals',
+                  'neo4j_lab_3_claims_financial_modeling']
+
+# Bump when clear_database, load_base_data or is_data_creation change, so the
+# cached base data snapshot is rebuilt
+BASE_DATA_VERSION = 1
+
+# Extracted queries, keyed by extractor version and lab file content hash.
+# Bump EXTRACTOR_VERSION when extract_cypher_from_lab changes
+EXTRACTION_CACHE_DIR = SCRIPT_DIR / ".cache" / "extracted"
+EXTRACTOR_VERSION = 1
+CYPHER_BLOCK_PATTERN = r'```cypher\n(.*?)\n```'
+
 
 def extract_cypher_from_lab(lab_file: Path) -> List[Tuple[int, str]]:
-    """Extract all Cypher code blocks from a lab markdown file."""
+    """Extract all Cypher code blocks from a lab markdown file.
+
+    Every xdist worker collects the suite, so results are cached by file hash.
+    """
     with open(lab_file, 'r', encoding='utf-8') as f:
         content = f.read()
 
-    pattern = r'```cypher\n(.*?)\n```'
-    matches = re.findall(pattern, content, re.DOTALL)
-    return [(i+1, query) for i, query in enumerate(matches)]
+    digest = hashlib.sha256(f"{EXTRACTOR_VERSION}:{CYPHER_BLOCK_PATTERN}:{content}".encode('utf-8')).hexdigest()
+    cache_file = EXTRACTION_CACHE_DIR / f"{digest}.json"
+    if cache_file.exists():
+        return [tuple(query) for query in json.loads(cache_file.read_text(encoding='utf-8'))]
+
+    matches = re.findall(CYPHER_BLOCK_PATTERN, content, re.DOTALL)
+    queries = [(i+1, query) for i, query in enumerate(matches)]
+
+    # Workers may race to write the same entry: write privately, then rename
+    EXTRACTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    temporary = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(queries), encoding='utf-8')
+    os.replace(temporary, cache_file)
+    return queries
 
 
 def clean_cypher(cypher: str) -> str:
@@ -135,6 +169,92 @@ def is_data_query(cypher: str) -> bool:
     return False  # Temporarily disable data validation for all MATCH queries
 
 
+def restore_base_data(driver, database: str):
+    """Restore the Labs 1-3 base data from its snapshot, building it on the first run."""
+    # The snapshot is rebuilt whenever a base lab file or BASE_DATA_VERSION changes
+    def build():
+        clear_database(driver, database)
+        load_base_data(driver, database)
+
+    LabSnapshots(driver, database).cached(
+        f"lab_queries_base-v{BASE_DATA_VERSION}", [LABS_DIR / f"{lab}.md" for lab in BASE_DATA_LABS], build
+    )
+
+
+def clear_database(driver, database: str):
+    """Clear all data and constraints from database."""
+    with driver.session(database=database) as session:
+        # Drop all constraints
+        constraints = session.run("SHOW CONSTRAINTS").data()
+        for constraint in constraints:
+            try:
+                session.run(f"DROP CONSTRAINT {constraint['name']}")
+            except:
+                pass
+
+        # Delete all nodes and relationships
+        session.run("MATCH (n) DETACH DELETE n")
+        print("✓ Database cleared")
+
+
+def load_base_data(driver, database: str):
+    """Load base data from Labs 1-4 required for all tests."""
+    print("Loading base data from Labs 1-4...")
+
+    # Check if data already exists
+    with driver.session(database=database) as session:
+        result = session.run("MATCH (n) RETURN count(n) AS count")
+        count = result.single()["count"]
+
+        if count > 100:  # Data already exists
+            print(f"✓ Data already loaded ({count} nodes)")
+            return
+
+    # Load data from Labs 1-3
+    for lab_name in BASE_DATA_LABS:
+        lab_file = LABS_DIR / f"{lab_name}.md"
+        if not lab_file.exists():
+            continue
+
+        queries = extract_cypher_from_lab(lab_file)
+        loaded_count = 0
+
+        for query_num, raw_query in queries:
+            cleaned = clean_cypher(raw_query)
+
+            if not is_executable_query(cleaned):
+                continue
+
+            # Skip queries that require optional plugins
+            if requires_gds_plugin(cleaned):
+                continue
+
+            # Only execute data creation queries during setup
+            if not is_data_creation(cleaned):
+                continue
+
+            # Execute data creation query
+            try:
+                with driver.session(database=database) as session:
+                    session.run(cleaned)
+                    loaded_count += 1
+            except ClientError as e:
+                # Ignore constraint/uniqueness errors during data load
+                if 'already exists' in str(e).lower() or 'constraint' in str(e).lower():
+                    continue
+                # Ignore other data load errors that don't affect testing
+                pass
+
+        if loaded_count > 0:
+            print(f"✓ Loaded {loaded_count} queries from {lab_name}")
+
+    # Verify data loaded
+    with driver.session(database=database) as session:
+        result = session.run("MATCH (n) RETURN count(n) AS count")
+        count = result.single()["count"]
+        print(f"✓ Total nodes in database: {count}")
+
+
 # Discover all lab files
 ALL_LABS = []
 for lab_file in sorted(LABS_DIR.glob("neo4j_lab_*.md")):
@@ -154,7 +274,8 @@ class TestComprehensiveLabQueries:
     """
 
     driver = None
-    data_loaded = False
+    session = None
+    database = NEO4J_DATABASE
     last_lab_tested = None
 
     @classmethod
@@ -165,102 +286,37 @@ class TestComprehensiveLabQueries:
             cls.driver.verify_connectivity()
             print("\n✓ Connected to Neo4j")
 
-            # Clear database to start fresh
-            cls.clear_database()
+            # Under pytest-xdist each worker gets a database of its own
+            cls.database = worker_database(NEO4J_DATABASE, "labtests")
+            if cls.database != NEO4J_DATABASE:
+                cls.create_worker_database()
 
-            # Load data from Labs 1-4 to ensure all tests can run
-            cls.load_base_data()
+            cls.restore_base_data()
+            # One session serves every query on this worker; it reuses a pooled connection
+            cls.session = cls.driver.session(database=cls.database)
 
         except ServiceUnavailable:
             pytest.fail("Neo4j is not running. Start with: cd mac && ./start-neo4j.sh")
 
     @classmethod
-    def clear_database(cls):
-        """Clear all data and constraints from database."""
-        with cls.driver.session(database=NEO4J_DATABASE) as session:
-            # Drop all constraints
-            constraints = session.run("SHOW CONSTRAINTS").data()
-            for constraint in constraints:
-                try:
-                    session.run(f"DROP CONSTRAINT {constraint['name']}")
-                except:
-                    pass
-
-            # Delete all nodes and relationships
-            session.run("MATCH (n) DETACH DELETE n")
-            print("✓ Database cleared")
+    def create_worker_database(cls):
+        """Create this worker's database (Neo4j Enterprise)."""
+        try:
+            create_database(cls.driver, cls.database)
+        except ClientError as e:
+            pytest.fail(f"Parallel runs need one database per worker (Neo4j Enterprise): {e}")
+        print(f"✓ Worker database {cls.database} ready")
 
     @classmethod
-    def load_base_data(cls):
-        """Load base data from Labs 1-4 required for all tests."""
-        if cls.data_loaded:
-            return
-
-        print("Loading base data from Labs 1-4...")
-
-        # Check if data already exists
-        with cls.driver.session(database=NEO4J_DATABASE) as session:
-            result = session.run("MATCH (n) RETURN count(n) AS count")
-            count = result.single()["count"]
-
-            if count > 100:  # Data already exists
-                print(f"✓ Data already loaded ({count} nodes)")
-                cls.data_loaded = True
-                return
-
-        # Load data from Labs 1-4
-        data_labs = ['neo4j_lab_1_enterprise_setup',
-                     'neo4j_lab_2_cypher_fundamentals',
-                     'neo4j_lab_3_claims_financial_modeling']
-
-        for lab_name in data_labs:
-            lab_file = LABS_DIR / f"{lab_name}.md"
-            if not lab_file.exists():
-                continue
-
-            queries = extract_cypher_from_lab(lab_file)
-            loaded_count = 0
-
-            for query_num, raw_query in queries:
-                cleaned = clean_cypher(raw_query)
-
-                if not is_executable_query(cleaned):
-                    continue
-
-                # Skip queries that require optional plugins
-                if requires_gds_plugin(cleaned):
-                    continue
-
-                # Only execute data creation queries during setup
-                if not is_data_creation(cleaned):
-                    continue
-
-                # Execute data creation query
-                try:
-                    with cls.driver.session(database=NEO4J_DATABASE) as session:
-                        session.run(cleaned)
-                        loaded_count += 1
-                except ClientError as e:
-                    # Ignore constraint/uniqueness errors during data load
-                    if 'already exists' in str(e).lower() or 'constraint' in str(e).lower():
-                        continue
-                    # Ignore other data load errors that don't affect testing
-                    pass
-
-            if loaded_count > 0:
-                print(f"✓ Loaded {loaded_count} queries from {lab_name}")
-
-        # Verify data loaded
-        with cls.driver.session(database=NEO4J_DATABASE) as session:
-            result = session.run("MATCH (n) RETURN count(n) AS count")
-            count = result.single()["count"]
-            print(f"✓ Total nodes in database: {count}")
-
-        cls.data_loaded = True
+    def restore_base_data(cls):
+        """Restore the Labs 1-3 base data into this worker's database."""
+        restore_base_data(cls.driver, cls.database)
 
     @classmethod
     def teardown_class(cls):
         """Cleanup: Close driver connection."""
+        if cls.session:
+            cls.session.close()
         if cls.driver:
             cls.driver.close()
             print("\n✓ Neo4j connection closed")
@@ -271,19 +327,18 @@ class TestComprehensiveLabQueries:
         Returns (success: bool, error_message: str)
         """
         try:
-            with self.driver.session(database=NEO4J_DATABASE) as session:
-                result = session.run(cypher)
-                # Consume result AND validate data for MATCH queries
-                records = list(result)
+            result = self.session.run(cypher)
+            # Consume result AND validate data for MATCH queries
+            records = list(result)
 
-                # For MATCH queries (data retrieval), verify we got data back
-                cypher_lower = cypher.lower().strip()
-                if is_data_query(cypher):
-                    if len(records) == 0:
-                        # This is a real problem - query returns no data
-                        return (False, f"Query returned 0 rows - data may be missing or query is incorrect")
+            # For MATCH queries (data retrieval), verify we got data back
+            cypher_lower = cypher.lower().strip()
+            if is_data_query(cypher):
+                if len(records) == 0:
+                    # This is a real problem - query returns no data
+                    return (False, f"Query returned 0 rows - data may be missing or query is incorrect")
 
-                return (True, "")
+            return (True, "")
 
         except Skipped:
             # Re-raise pytest skip exceptions
@@ -342,10 +397,12 @@ class TestComprehensiveLabQueries:
                 return (True, "Transaction memory limit (environment constraint, not syntax error)")
             return (False, error_str)
 
+    # One xdist group per lab: its queries build on each other, so they run
+    # in order on one worker (pytest -n auto --dist loadgroup)
     @pytest.mark.parametrize(
         "lab_name,query_num,raw_query",
         [
-            (lab['name'], q[0], q[1])
+            pytest.param(lab['name'], q[0], q[1], marks=pytest.mark.xdist_group(lab['name']))
             for lab in ALL_LABS
             for q in lab['queries']
         ],
@@ -358,6 +415,13 @@ class TestComprehensiveLabQueries:
     def test_query_execution(self, lab_name, query_num, raw_query):
         """Test execution of every Cypher query from all labs."""
 
+        # Every lab starts from the base data, so its results do not depend on
+        # which labs ran before it on this worker
+        cls = type(self)
+        if cls.last_lab_tested is not None and cls.last_lab_tested != lab_name:
+            cls.restore_base_data()
+        cls.last_lab_tested = lab_name
+
         # Clean the query
         cleaned = clean_cypher(raw_query)
 